@@ -1,8 +1,11 @@
 from __future__ import annotations
 import logging
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.hdrs import USER_AGENT
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
 
 from .const import DOMAIN, PLATFORMS
 from .api import CubyApi
@@ -10,6 +13,11 @@ from .coordinator import CubyCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Private connector for the poll path: every refresh fans out to the same host
+CONNECTOR_LIMIT_PER_HOST = 8
+DNS_CACHE_TTL = 300  # seconds
+KEEPALIVE_TIMEOUT = 75  # seconds
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     return True
 
@@ -17,20 +25,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
     token: str = entry.data["token"]
-    session = async_get_clientsession(hass)
+    connector = TCPConnector(
+        limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    # Same User-Agent the shared HA session sends
+    session = ClientSession(connector=connector, headers={USER_AGENT: SERVER_SOFTWARE})
+
+    async def _close_session(_event: Event) -> None:
+        await session.close()
+
+    # Closed on unload (also if setup fails partway) and on HA stop, which does not unload entries
+    entry.async_on_unload(session.close)
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _close_session))
     api = CubyApi(session)
 
     coordinator = CubyCoordinator(hass, api, token, entry)
 
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as err:
-        _LOGGER.warning(
-            "Initial devices refresh failed for %s: %s (will retry in background)",
-            entry.title,
-            err,
-        )
-
     hass.data[DOMAIN][entry.entry_id] = {
         "api": api,
         "coordinator": coordinator,
@@ -39,10 +51,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Reload entities when options (gear) change
     entry.async_on_unload(entry.add_update_listener(_options_updated))
 
+    # Run the first refresh alongside platform setup; platforms add entities once devices arrive
+    first_refresh = hass.async_create_task(coordinator.async_config_entry_first_refresh())
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    try:
+        await first_refresh
+    except Exception as err:
+        _LOGGER.warning(
+            "Initial devices refresh failed for %s: %s (will retry in background)",
+            entry.title,
+            err,
+        )
     return True
 
 async def _options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if data:
+        data["coordinator"].invalidate_selected()
     await hass.config_entries.async_reload(entry.entry_id)
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
-from aiohttp import ClientSession, ClientTimeout
+from aiohttp import ClientResponse, ClientSession, ClientTimeout
+
+try:
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    from json import loads as _loads
 
 TOKEN_TTL_SECONDS = 365 * 24 * 60 * 60  # A Year / 365 days
 DEFAULT_TIMEOUT = 15  # seconds
+CONNECT_TIMEOUT = 5  # seconds; a slow DNS/TCP connect should not eat the whole budget
 
 
 class CubyAuthError(Exception):
@@ -18,10 +24,20 @@ class CubyApiError(Exception):
 class CubyApi:
     """Cuby HTTP client using HA's aiohttp session."""
 
-    def __init__(self, session: ClientSession, base_url: str = "https://cuby.cloud/api/v2") -> None:
+    def __init__(
+        self,
+        session: ClientSession,
+        base_url: str = "https://cuby.cloud/api/v2",
+        timeout: Optional[ClientTimeout] = None,
+    ) -> None:
         self._session = session
         self._base_url = base_url.rstrip("/")
-        self._timeout = ClientTimeout(total=DEFAULT_TIMEOUT)
+        self._timeout = timeout or ClientTimeout(
+            total=DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT, sock_connect=CONNECT_TIMEOUT
+        )
+        self._bulk_supported = True  # flipped off once the server rejects GET /state?ids=
+        self._hdr_token: Optional[str] = None
+        self._hdr: Dict[str, str] = {}
 
     # ----------------------
     # Auth / Token
@@ -35,20 +51,27 @@ class CubyApi:
         payload = {"password": password, "expiration": ttl_seconds}
 
         async with self._session.post(url, json=payload, timeout=self._timeout) as resp:
-            if resp.status == 401:
-                raise CubyAuthError("Invalid credentials.")
-            if resp.status >= 400:
-                text = await resp.text()
-                raise CubyApiError(f"API {resp.status}: {text}")
-            data = await resp.json()
+            data = await self._parse(resp, auth_message="Invalid credentials.")
 
         token = data.get("token") or data.get("access_token")
         if not token:
             raise CubyApiError("Token not found in response.")
         return {"token": token, "raw": data, "expires_in": ttl_seconds}
 
+    async def _parse(self, resp: ClientResponse, auth_message: str = "Token expired or invalid.") -> Any:
+        """Raise on 401/4xx/5xx, otherwise return the decoded JSON body."""
+        if resp.status == 401:
+            raise CubyAuthError(auth_message)
+        if resp.status >= 400:
+            raise CubyApiError(f"API {resp.status}: {await resp.text()}")
+        return await resp.json(loads=_loads)
+
     def _auth_headers(self, token: str) -> Dict[str, str]:
-        return {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+        # Token is fixed per entry, so build the headers once and reuse them (treated as read-only)
+        if token != self._hdr_token:
+            self._hdr_token = token
+            self._hdr = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+        return self._hdr
 
     # ----------------------
     # Devices
@@ -61,12 +84,7 @@ class CubyApi:
         """
         url = f"{self._base_url}/devices"
         async with self._session.get(url, headers=self._auth_headers(token), timeout=self._timeout) as resp:
-            if resp.status == 401:
-                raise CubyAuthError("Token expired or invalid.")
-            if resp.status >= 400:
-                text = await resp.text()
-                raise CubyApiError(f"API {resp.status}: {text}")
-            data = await resp.json()
+            data = await self._parse(resp)
 
         return data if isinstance(data, list) else data.get("devices", [])
 
@@ -80,12 +98,7 @@ class CubyApi:
         params = {"getState": "true"}
 
         async with self._session.get(url, headers=self._auth_headers(token), params=params, timeout=self._timeout) as resp:
-            if resp.status == 401:
-                raise CubyAuthError("Token expired or invalid.")
-            if resp.status >= 400:
-                text = await resp.text()
-                raise CubyApiError(f"API {resp.status}: {text}")
-            data = await resp.json()
+            data = await self._parse(resp)
 
         if not isinstance(data, dict):
             raise CubyApiError(f"Invalid device detail for {device_id}: {data}")
@@ -102,17 +115,45 @@ class CubyApi:
         """
         url = f"{self._base_url}/state/{device_id}"
         async with self._session.get(url, headers=self._auth_headers(token), timeout=self._timeout) as resp:
-            if resp.status == 401:
-                raise CubyAuthError("Token expired or invalid.")
-            if resp.status >= 400:
-                text = await resp.text()
-                raise CubyApiError(f"API {resp.status}: {text}")
-            data = await resp.json()
+            data = await self._parse(resp)
 
         if not isinstance(data, dict):
             raise CubyApiError(f"Invalid state for {device_id}: {data}")
         return data
 
+    async def get_states_bulk(self, token: str, device_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return current AC state for several devices in a single round trip.
+        GET /state?ids=a,b,c -> [ {state}, ... ] (same order as ids) or { id: {state}, ... }
+        Returns {} if the server does not support bulk reads (400/404/405/501; remembered);
+        callers should then use get_state.
+        """
+        if not self._bulk_supported or not device_ids:
+            return {}
+
+        url = f"{self._base_url}/state"
+        params = {"ids": ",".join(device_ids)}
+        async with self._session.get(url, headers=self._auth_headers(token), params=params, timeout=self._timeout) as resp:
+            # Route missing/unsupported: stop trying. Transient codes (408, 429, 5xx) just fall back this poll
+            if resp.status in (400, 404, 405, 501):
+                self._bulk_supported = False
+                return {}
+            data = await self._parse(resp)
+
+        if isinstance(data, dict):
+            data = data.get("states", data)
+
+        out: Dict[str, Dict[str, Any]] = {}
+        if isinstance(data, list):
+            for device_id, state in zip(device_ids, data):
+                if isinstance(state, dict):
+                    out[str(state.get("id") or device_id)] = state
+        elif isinstance(data, dict):
+            for device_id, state in data.items():
+                if isinstance(state, dict):
+                    out[str(device_id)] = state
+        return out
+
     async def set_state(self, token: str, device_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send a control command to the device.
@@ -130,11 +171,6 @@ class CubyApi:
 
         url = f"{self._base_url}/state/{device_id}"
         async with self._session.post(url, headers=self._auth_headers(token), json=payload, timeout=self._timeout) as resp:
-            if resp.status == 401:
-                raise CubyAuthError("Token expired or invalid.")
-            if resp.status >= 400:
-                text = await resp.text()
-                raise CubyApiError(f"API {resp.status}: {text}")
-            data = await resp.json()
+            data = await self._parse(resp)
 
         return data
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any, Optional, Dict, List
 
 from homeassistant.components.climate import ClimateEntity, ClimateEntityFeature, HVACMode
 from homeassistant.components.climate.const import SWING_BOTH, SWING_OFF
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.const import UnitOfTemperature, ATTR_TEMPERATURE
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -14,7 +15,7 @@ from homeassistant.helpers.device_registry import DeviceInfo
 
 from .const import DOMAIN
 from .coordinator import CubyCoordinator
-from .api import CubyApi, CubyApiError
+from .api import CubyApi
 
 _LOGGER = logging.getLogger(__name__)
 PARALLEL_UPDATES = 0
@@ -28,8 +29,19 @@ SUPPORTED_HVAC_MODES = [
     HVACMode.AUTO,
 ]
 SUPPORTED_FAN_MODES = ["auto", "low", "medium", "high"]
+_FAN_MODES_SET = frozenset(SUPPORTED_FAN_MODES)
 SUPPORTED_SWING_MODES = [SWING_OFF, SWING_BOTH]
 
+# Cuby "mode" <-> HA HVACMode
+_MODE_FROM_STR: Dict[str, HVACMode] = {
+    "cool": HVACMode.COOL,
+    "heat": HVACMode.HEAT,
+    "fan": HVACMode.FAN_ONLY,
+    "dry": HVACMode.DRY,
+    "auto": HVACMode.AUTO,
+}
+_MODE_TO_STR: Dict[HVACMode, str] = {v: k for k, v in _MODE_FROM_STR.items()}
+
 SUPPORTED_FEATURES = (
     ClimateEntityFeature.TARGET_TEMPERATURE
     | ClimateEntityFeature.TURN_ON
@@ -49,12 +61,25 @@ def _safe_float(v: Any) -> Optional[float]:
     except (TypeError, ValueError):
         return None
 
+# Canonical lowercase values the Cuby API sends; lookups return these shared objects
+_KNOWN: Dict[str, str] = {
+    v: v for v in ("on", "off", "cool", "heat", "fan", "dry", "auto", "low", "medium", "high", "c", "f")
+}
+
+def _norm(v: Any, default: str) -> str:
+    """Lowercase a known lastState value; anything else (incl. non-strings) -> default."""
+    if not isinstance(v, str):
+        return default
+    s = v.lower()
+    return _KNOWN.get(s) or _KNOWN.get(s.strip(), default)
+
 def _extract_id(d: Dict[str, Any]) -> Optional[str]:
-    for k in ("id", "deviceId", "uuid", "device_id"):
-        val = d.get(k)
-        if val is not None and str(val).strip():
-            return str(val)
-    return None
+    val = d.get("id") or d.get("deviceId") or d.get("uuid") or d.get("device_id")
+    if val is None:
+        return None
+    if isinstance(val, str):
+        return val if val.strip() else None
+    return str(val) or None
 
 # -------------------------
 # Platform setup function
@@ -72,10 +97,9 @@ async def async_setup_entry(
 
     selected_ids: Optional[List[str]] = entry.options.get("device_ids", entry.data.get("device_ids", None))
 
-    devices = coordinator.data or []
     _LOGGER.debug(
         "Building climate entities from %s devices; selected_ids=%s (None=all, []=none)",
-        len(devices),
+        len(coordinator.data or []),
         selected_ids,
     )
 
@@ -84,20 +108,31 @@ async def async_setup_entry(
         async_add_entities([])
         return
 
-    entities: List[CubyDeviceClimate] = []
-    for dev in devices:
-        if not isinstance(dev, dict):
-            continue
-        dev_id = _extract_id(dev)
-        if not dev_id:
-            continue
-        if isinstance(selected_ids, list) and dev_id not in selected_ids:
-            continue
-        name = dev.get("name") or dev.get("alias") or f"Cuby Device {dev_id}"
-        entities.append(CubyDeviceClimate(coordinator, api, token, dev_id, name))
-
-    _LOGGER.debug("Adding %s climate entities", len(entities))
-    async_add_entities(entities)
+    selected_set = frozenset(selected_ids) if isinstance(selected_ids, list) else None
+    known_ids: set[str] = set()
+
+    @callback
+    def _add_new_entities() -> None:
+        entities: List[CubyDeviceClimate] = []
+        for dev in coordinator.data or []:
+            if not isinstance(dev, dict):
+                continue
+            dev_id = _extract_id(dev)
+            if not dev_id or dev_id in known_ids:
+                continue
+            if selected_set is not None and dev_id not in selected_set:
+                continue
+            known_ids.add(dev_id)
+            name = dev.get("name") or dev.get("alias") or f"Cuby Device {dev_id}"
+            entities.append(CubyDeviceClimate(coordinator, api, token, dev_id, name))
+
+        if entities:
+            _LOGGER.debug("Adding %s climate entities", len(entities))
+            async_add_entities(entities)
+
+    _add_new_entities()
+    # The first refresh may still be running; add devices as they show up
+    entry.async_on_unload(coordinator.async_add_listener(_add_new_entities))
 
 
 # -------------------------
@@ -106,6 +141,7 @@ async def async_setup_entry(
 class CubyDeviceClimate(CoordinatorEntity[CubyCoordinator], ClimateEntity):
     """Representation of a Cuby A/C as a Home Assistant climate entity."""
 
+    _attr_should_poll = False
     _attr_supported_features = SUPPORTED_FEATURES
     _attr_hvac_modes = SUPPORTED_HVAC_MODES
     _attr_min_temp = 16
@@ -126,6 +162,10 @@ class CubyDeviceClimate(CoordinatorEntity[CubyCoordinator], ClimateEntity):
         self._device_id = device_id
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_{device_id}"
+        self._cached_device_info: DeviceInfo | None = None
+        self._cached_fw: str | None = None
+        self._last_payload_key: tuple | None = None
+        self._last_available: bool | None = None
 
         self._apply_payload(self._device_payload())
 
@@ -133,33 +173,48 @@ class CubyDeviceClimate(CoordinatorEntity[CubyCoordinator], ClimateEntity):
     @property
     def device_info(self) -> DeviceInfo:
         d = self._device_payload() or {}
-        model = d.get("model", "Cuby Smart AC Controller")
         fw = str(d.get("firmwareVersion") or d.get("fw") or d.get("firmware") or "unknown")
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._device_id)},
-            name=self._attr_name or "Cuby Device",
-            manufacturer="Cuby",
-            model=str(model),
-            sw_version=fw,
-            via_device=(DOMAIN, self.coordinator.config_entry.entry_id),
-        )
+        # Identity never changes; only rebuild when the firmware string does
+        if self._cached_device_info is None or fw != self._cached_fw:
+            model = d.get("model", "Cuby Smart AC Controller")
+            self._cached_fw = fw
+            self._cached_device_info = DeviceInfo(
+                identifiers={(DOMAIN, self._device_id)},
+                name=self._attr_name or "Cuby Device",
+                manufacturer="Cuby",
+                model=str(model),
+                sw_version=fw,
+                via_device=(DOMAIN, self.coordinator.config_entry.entry_id),
+            )
+        return self._cached_device_info
 
     # ----- Helpers -----
     def _device_payload(self) -> Dict[str, Any] | None:
-        """Return the current device dict from coordinator.data by id."""
-        for d in self.coordinator.data or []:
-            if isinstance(d, dict) and _extract_id(d) == self._device_id:
-                return d
-        return None
+        """Return the current device dict from the coordinator's id index."""
+        return self.coordinator.data_by_id.get(self._device_id)
 
-    def _apply_payload(self, device: Dict[str, Any] | None) -> None:
-        """Map coordinator payload to HA attributes."""
+    def _apply_payload(self, device: Dict[str, Any] | None) -> bool:
+        """Map coordinator payload to HA attributes. Returns False if nothing relevant changed."""
         d = device or {}
         last = d.get("lastState") or {}
         env = d.get("data") or {}
 
+        key = (
+            last.get("units"),
+            env.get("temperature"),
+            last.get("temperature"),
+            last.get("power"),
+            last.get("mode"),
+            last.get("fan"),
+            last.get("verticalVane"),
+            last.get("horizontalVane"),
+        )
+        if key == self._last_payload_key:
+            return False
+        self._last_payload_key = key
+
         # Unity
-        units = str(last.get("units", "c")).strip().lower()
+        units = _norm(last.get("units"), "c")
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS if units == "c" else UnitOfTemperature.FAHRENHEIT
 
         # Temperature
@@ -168,35 +223,34 @@ class CubyDeviceClimate(CoordinatorEntity[CubyCoordinator], ClimateEntity):
         self._attr_target_temperature = tgt
 
         # HVAC
-        power = str(last.get("power", "off")).lower()
-        mode = str(last.get("mode", "auto")).lower()
+        power = _norm(last.get("power"), "off")
         if power == "off":
             self._attr_hvac_mode = HVACMode.OFF
         else:
-            self._attr_hvac_mode = {
-                "cool": HVACMode.COOL,
-                "heat": HVACMode.HEAT,
-                "fan": HVACMode.FAN_ONLY,
-                "dry": HVACMode.DRY,
-                "auto": HVACMode.AUTO,
-            }.get(mode, HVACMode.AUTO)
-        
+            self._attr_hvac_mode = _MODE_FROM_STR.get(_norm(last.get("mode"), "auto"), HVACMode.AUTO)
+
         # Fan mode (from device lastState)
-        fan = str((last.get("fan") or "auto")).lower()
-        if fan not in SUPPORTED_FAN_MODES:
+        fan = _norm(last.get("fan"), "auto")
+        if fan not in _FAN_MODES_SET:
             fan = "auto"
         self._attr_fan_mode = fan
 
         # Cuby: "auto" => swing ON | "off" => swing OFF
-        vertical = str((last.get("verticalVane") or "off")).lower()
-        horizontal = str((last.get("horizontalVane") or "off")).lower()
+        vertical = _norm(last.get("verticalVane"), "off")
+        horizontal = _norm(last.get("horizontalVane"), "off")
         swing_on = (vertical == "auto") or (horizontal == "auto")
         self._attr_swing_mode = SWING_BOTH if swing_on else SWING_OFF
+        return True
 
     # ----- Coordinator hooks -----
-    async def async_update(self) -> None:
-        dev = self._device_payload()
-        self._apply_payload(dev)
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        changed = self._apply_payload(self._device_payload())
+        available = self.available
+        # Skip the state write for idle devices, unless availability flipped
+        if changed or available != self._last_available:
+            self._last_available = available
+            self.async_write_ha_state()
 
     # ----- Climate actions -----
     async def async_set_temperature(self, **kwargs: Any) -> None:
@@ -212,14 +266,7 @@ class CubyDeviceClimate(CoordinatorEntity[CubyCoordinator], ClimateEntity):
         if hvac_mode == HVACMode.OFF:
             await self.async_turn_off()
             return
-        mode_map = {
-            HVACMode.COOL: "cool",
-            HVACMode.HEAT: "heat",
-            HVACMode.FAN_ONLY: "fan",
-            HVACMode.DRY: "dry",
-            HVACMode.AUTO: "auto",
-        }
-        payload = {"type": "mode", "mode": mode_map.get(hvac_mode, "auto"), "power": "on"}
+        payload = {"type": "mode", "mode": _MODE_TO_STR.get(hvac_mode, "auto"), "power": "on"}
         await self._post_state(payload)
         self._attr_hvac_mode = hvac_mode
         self.async_write_ha_state()
@@ -239,7 +286,7 @@ class CubyDeviceClimate(CoordinatorEntity[CubyCoordinator], ClimateEntity):
     async def async_set_fan_mode(self, fan_mode: str) -> None:
         """Set fan speed (auto/low/medium/high)."""
         fm = (fan_mode or "").lower()
-        if fm not in SUPPORTED_FAN_MODES:
+        if fm not in _FAN_MODES_SET:
             _LOGGER.warning("[CUBY] Unsupported fan mode requested: %s", fan_mode)
             return
 
@@ -263,21 +310,20 @@ class CubyDeviceClimate(CoordinatorEntity[CubyCoordinator], ClimateEntity):
         target_val = "auto" if desired_on else "off"
 
         # Envía solo lo que haga falta (si tu equipo requiere power on, añade "power": "on")
+        writes = []
         if cur_vert != target_val:
-            await self._post_state({"type": "verticalVane", "verticalVane": target_val})
+            writes.append(self._post_state({"type": "verticalVane", "verticalVane": target_val}))
         if cur_horz != target_val:
-            await self._post_state({"type": "horizontalVane", "horizontalVane": target_val})
+            writes.append(self._post_state({"type": "horizontalVane", "horizontalVane": target_val}))
+        # Queued together so both vanes go out in the same flush
+        await asyncio.gather(*writes)
 
         # Reflejar en UI de inmediato
         self._attr_swing_mode = SWING_BOTH if desired_on else SWING_OFF
         self.async_write_ha_state()
 
     async def _post_state(self, payload: Dict[str, Any]) -> None:
-        try:
-            _LOGGER.debug("[CUBY] set_state(%s): %s", self._device_id, payload)
-            await self._api.set_state(self._token, self._device_id, payload)
-        except CubyApiError as err:
-            _LOGGER.error("[CUBY] set_state failed for %s: %s", self._device_id, err)
-            raise
-        # Request refresh from coordinator to get updated state
-        await self.coordinator.async_request_refresh()
+        # Optimistic attributes are set after this; make the next refresh re-apply the payload
+        self._last_payload_key = None
+        # Coalesced with other writes; the coordinator posts and refreshes once per burst
+        await self.coordinator.queue_write(self._device_id, payload)
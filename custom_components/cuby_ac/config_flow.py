@@ -1,6 +1,8 @@
 from __future__ import annotations
+import asyncio
 import logging
 import voluptuous as vol
+from aiohttp import ClientConnectorError, ClientError, ClientTimeout
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
@@ -11,6 +13,22 @@ from .api import CubyApi, CubyAuthError, CubyApiError, TOKEN_TTL_SECONDS
 
 _LOGGER = logging.getLogger(__name__)
 
+# The flows block the UI, so fail fast instead of using the 15s polling timeout
+FLOW_TIMEOUT = ClientTimeout(total=8, connect=3, sock_connect=3)
+FLOW_DEADLINE = 10  # seconds, per get_devices attempt
+
+
+async def _async_get_devices(api: CubyApi, token: str) -> list[dict]:
+    """get_devices with a hard deadline and one retry on a connection error (DNS/TCP hiccup)."""
+    try:
+        async with asyncio.timeout(FLOW_DEADLINE):
+            return await api.get_devices(token)
+    except ClientConnectorError as exc:
+        _LOGGER.debug("get_devices connection failed (%s), retrying once", exc)
+    async with asyncio.timeout(FLOW_DEADLINE):
+        return await api.get_devices(token)
+
+
 @config_entries.HANDLERS.register(DOMAIN)
 class ConfigFlow(config_entries.ConfigFlow):
     """Handle Cuby AC config flow."""
@@ -29,17 +47,20 @@ class ConfigFlow(config_entries.ConfigFlow):
             self._abort_if_unique_id_configured()
 
             session = async_get_clientsession(self.hass)
-            api = CubyApi(session)
+            api = CubyApi(session, timeout=FLOW_TIMEOUT)
 
             try:
                 auth = await api.get_token(username, password, TOKEN_TTL_SECONDS)
-                devices = await api.get_devices(auth["token"])
+                devices = await _async_get_devices(api, auth["token"])
             except CubyAuthError:
                 _LOGGER.debug("Invalid credentials for user %s", username)
                 errors["base"] = "invalid_auth"
             except CubyApiError as exc:
                 _LOGGER.warning("Cuby API error during login/devices: %s", exc)
                 errors["base"] = "cannot_connect"
+            except (ClientError, asyncio.TimeoutError) as exc:
+                _LOGGER.warning("Cannot reach Cuby API during login/devices: %s", exc)
+                errors["base"] = "cannot_connect"
             except Exception as exc:
                 _LOGGER.exception("Unexpected error during login/devices: %s", exc)
                 errors["base"] = "unknown"
@@ -99,10 +120,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         # Fetch current devices from API using stored token
         token: str = self._entry.data.get("token")
         session = async_get_clientsession(self.hass)
-        api = CubyApi(session)
+        api = CubyApi(session, timeout=FLOW_TIMEOUT)
 
         try:
-            devices = await api.get_devices(token)
+            devices = await _async_get_devices(api, token)
         except Exception as exc:
             devices = []
             _LOGGER.warning("Could not fetch devices during options: %s", exc)
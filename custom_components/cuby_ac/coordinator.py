@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 
-from homeassistant.core import HomeAssistant
+from aiohttp import ClientError
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import CubyApi, CubyApiError, CubyAuthError
+from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+SCAN_INTERVAL_SECONDS = 60
+MAX_SCAN_INTERVAL_SECONDS = 300  # back off to this while nothing changes
+MAX_CONCURRENT_REQUESTS = 8  # keep below the aiohttp per-host connector limit
+WRITE_DEBOUNCE_SECONDS = 0.2  # coalesce bursts of set_state (e.g. dragging the temperature slider)
+
+_SENTINEL = object()
+
 
 def _index_by_id(devs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     out: Dict[str, Dict[str, Any]] = {}
@@ -30,18 +40,164 @@ class CubyCoordinator(DataUpdateCoordinator[List[Dict[str, Any]]]):
             hass,
             _LOGGER,
             name="Cuby devices/state",
-            update_interval=timedelta(seconds=60),
+            update_interval=timedelta(seconds=SCAN_INTERVAL_SECONDS),
         )
         self._api = api
         self._token = token
         self._entry = entry  # to read device_ids from options/data dynamically
+        self._selected_cache: Optional[List[str]] | object = _SENTINEL
+        self.data_by_id: Dict[str, Dict[str, Any]] = {}  # same dicts as self.data, keyed by id
+        self._state_time: Optional[float] = None  # loop time of the last successful refresh or local push
+        self._last_digest: Optional[int] = None
+        self._stable_count = 0  # consecutive polls with unchanged state
+
+        # Pending writes: latest payload per (device_id, type), flushed together after a short delay
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._pending_waiters: Dict[Tuple[str, str], List[asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._pending_refresh = False  # any write in the current burst wants a full refresh
+        self._locks: Dict[str, asyncio.Lock] = {}  # per-device: set_state is read-modify-write on lastState
 
     def _selected_ids(self) -> Optional[List[str]]:
         """ Selected IDs by the user. None = all, [] = none."""
+        if self._selected_cache is not _SENTINEL:
+            return self._selected_cache  # type: ignore[return-value]
         selected = self._entry.options.get("device_ids", self._entry.data.get("device_ids", None))
         if isinstance(selected, list):
-            return [str(x) for x in selected]
-        return None  # None => all
+            self._selected_cache = [str(x) for x in selected]
+        else:
+            self._selected_cache = None  # None => all
+        return self._selected_cache  # type: ignore[return-value]
+
+    def invalidate_selected(self) -> None:
+        """Forget the cached selection; called when the options flow changes device_ids."""
+        self._selected_cache = _SENTINEL
+
+    async def queue_write(
+        self, device_id: str, payload: Dict[str, Any], refresh: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Queue a set_state payload and wait until it has been sent.
+        Within WRITE_DEBOUNCE_SECONDS only the latest payload per (device, type) is posted,
+        followed by a single coordinator refresh (skipped if no write in the burst asked for one).
+        Returns the payload actually posted for this (device, type), which may be a later one.
+        """
+        if "type" not in payload or not isinstance(payload["type"], str):
+            raise ValueError("Payload must include a 'type' key (string).")
+
+        key = (device_id, payload["type"])
+        # Re-insert so the flush keeps the order in which each type was last requested
+        self._pending.pop(key, None)
+        self._pending[key] = payload
+        self._pending_refresh = self._pending_refresh or refresh
+        waiter = self.hass.loop.create_future()
+        self._pending_waiters.setdefault(key, []).append(waiter)
+
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(WRITE_DEBOUNCE_SECONDS, self._schedule_flush)
+        return await waiter
+
+    async def async_shutdown(self) -> None:
+        """Drop queued writes on unload/reload so nothing flushes through a closed session."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        waiters, self._pending_waiters = self._pending_waiters, {}
+        self._pending = {}
+        self._pending_refresh = False
+        for key_waiters in waiters.values():
+            for waiter in key_waiters:
+                if not waiter.done():
+                    waiter.set_exception(CubyApiError("Write not sent: integration is unloading."))
+        await super().async_shutdown()
+
+    @callback
+    def _schedule_flush(self) -> None:
+        self._flush_handle = None
+        self.hass.async_create_task(self._flush_writes())
+
+    async def _flush_writes(self) -> None:
+        pending, self._pending = self._pending, {}
+        waiters, self._pending_waiters = self._pending_waiters, {}
+        refresh, self._pending_refresh = self._pending_refresh, False
+
+        # Same device: send in order; different devices: concurrently
+        by_device: Dict[str, List[Tuple[Tuple[str, str], Dict[str, Any]]]] = {}
+        for key, payload in pending.items():
+            by_device.setdefault(key[0], []).append((key, payload))
+
+        async def _send(device_id: str, items: List[Tuple[Tuple[str, str], Dict[str, Any]]]) -> None:
+            # A previous flush may still be writing to this device
+            async with self._locks.setdefault(device_id, asyncio.Lock()):
+                for key, payload in items:
+                    try:
+                        self.logger.debug("[CUBY] set_state(%s): %s", device_id, payload)
+                        await self._api.set_state(self._token, device_id, payload)
+                    except Exception as err:
+                        self.logger.error("[CUBY] set_state failed for %s: %s", device_id, err)
+                        for waiter in waiters.pop(key, []):
+                            if not waiter.done():
+                                waiter.set_exception(err)
+
+        await self._gather_bounded([_send(did, items) for did, items in by_device.items()])
+
+        for key, key_waiters in waiters.items():
+            for waiter in key_waiters:
+                if not waiter.done():
+                    waiter.set_result(pending[key])
+
+        # Request refresh to get updated state; don't hold the flush on the debouncer cooldown.
+        # No extra throttle on top: the request debouncer folds requests made during its cooldown
+        # into one trailing refresh, so a write right after another still gets confirmed.
+        if refresh:
+            self.hass.async_create_background_task(
+                self.async_request_refresh(), name=f"{DOMAIN} refresh after write"
+            )
+
+    @callback
+    def apply_local_state(self, device_id: str, updates: Dict[str, Any]) -> None:
+        """Merge a known-good state change into lastState and push it to entities without polling."""
+        dev = self.data_by_id.get(device_id)
+        if dev is None:
+            return
+        last = dev.get("lastState")
+        if not isinstance(last, dict):
+            last = dev["lastState"] = {}
+        last.update(updates)
+        self._state_time = self.hass.loop.time()
+        # Not async_set_updated_data: that would cancel a pending debounced refresh and reset the poll timer
+        self.async_update_listeners()
+
+    def state_is_fresh(self) -> bool:
+        """True if cached state was confirmed (refresh or local push) within the base poll interval."""
+        return (
+            self._state_time is not None
+            and self.hass.loop.time() - self._state_time < SCAN_INTERVAL_SECONDS
+        )
+
+    async def _gather_bounded(self, coros: List[Awaitable[Any]]) -> List[Any]:
+        """Run coroutines concurrently (at most MAX_CONCURRENT_REQUESTS at once), keeping order."""
+        sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def _run(coro: Awaitable[Any]) -> Any:
+            async with sem:
+                return await coro
+
+        return await asyncio.gather(*(_run(c) for c in coros), return_exceptions=True)
+
+    def _adapt_interval(self, enriched: List[Dict[str, Any]]) -> None:
+        """Back off polling (60s -> 120s -> 240s -> 300s) while state is unchanged; snap back on change."""
+        digest = hash(tuple((d["id"], repr(d.get("lastState")), repr(d.get("data"))) for d in enriched))
+        if digest == self._last_digest:
+            self._stable_count += 1
+        else:
+            self._stable_count = 0
+        self._last_digest = digest
+
+        seconds = min(MAX_SCAN_INTERVAL_SECONDS, SCAN_INTERVAL_SECONDS * (2 ** min(self._stable_count, 3)))
+        if self.update_interval != timedelta(seconds=seconds):
+            self.logger.debug("Polling interval -> %ss (unchanged polls: %s)", seconds, self._stable_count)
+            self.update_interval = timedelta(seconds=seconds)
 
     async def _async_update_data(self) -> List[Dict[str, Any]]:
         """Fetch devices list and enrich with per-device state."""
@@ -53,6 +209,8 @@ class CubyCoordinator(DataUpdateCoordinator[List[Dict[str, Any]]]):
             # If the user explicitly chose "none", return empty list
             if isinstance(selected, list) and len(selected) == 0:
                 self.logger.debug("No devices selected; returning empty list.")
+                self.data_by_id = {}
+                self._state_time = self.hass.loop.time()
                 return []
 
             target_ids: List[str]
@@ -61,34 +219,61 @@ class CubyCoordinator(DataUpdateCoordinator[List[Dict[str, Any]]]):
             else:
                 target_ids = [d for d in selected if d in by_id]
 
+            # One bulk request first; per-device /state/{id} only for whatever it missed
+            bulk: Dict[str, Dict[str, Any]] = {}
+            try:
+                bulk = await self._api.get_states_bulk(self._token, target_ids)
+            except (CubyApiError, ClientError, asyncio.TimeoutError) as err:
+                self.logger.debug("get_states_bulk failed (%s), falling back to per-device state", err)
+
+            missing_ids = [did for did in target_ids if did not in bulk]
+            per_device = await self._gather_bounded(
+                [self._api.get_state(self._token, did) for did in missing_ids]
+            )
+            states_by_id: Dict[str, Any] = {**bulk, **dict(zip(missing_ids, per_device))}
+            states = [states_by_id[did] for did in target_ids]
+
+            # If /state/{id} fails, try full detail (only for the failed IDs)
+            failed_ids: List[str] = []
+            for did, res in zip(target_ids, states):
+                if isinstance(res, CubyApiError):
+                    self.logger.debug("get_state(%s) failed (%s), trying device_detail", did, res)
+                    failed_ids.append(did)
+                elif isinstance(res, BaseException):
+                    raise res
+
+            details: Dict[str, Any] = {}
+            if failed_ids:
+                detail_results = await self._gather_bounded(
+                    [self._api.get_device_detail(self._token, did) for did in failed_ids]
+                )
+                details = dict(zip(failed_ids, detail_results))
+
             enriched: List[Dict[str, Any]] = []
-            for did in target_ids:
-                base = dict(by_id.get(did, {}))
-                
-                base.setdefault("id", did)
+            for did, state in zip(target_ids, states):
+                # devices is freshly parsed this tick and owned by us; enrich in place
+                base = by_id.get(did) or {"id": did}
+
+                base["id"] = did  # normalized str id; entities and data_by_id key on it
                 base.setdefault("name", base.get("alias") or f"Cuby Device {did}")
                 base.setdefault("status", base.get("status", "unknown"))
 
-                state: Dict[str, Any] | None = None
-                try:
-                    state = await self._api.get_state(self._token, did)
-                except CubyApiError as err:
-                    # If /state/{id} fails, try full detail
-                    self.logger.debug("get_state(%s) failed (%s), trying device_detail", did, err)
-                    try:
-                        detail = await self._api.get_device_detail(self._token, did)
-                        
+                if did in details:
+                    detail = details[did]
+                    if isinstance(detail, BaseException):
+                        self.logger.warning("Failed to fetch detail for %s: %s", did, detail)
+                    else:
                         base["lastState"] = detail.get("lastState")
                         base["data"] = detail.get("data")
-                    except Exception as err2:
-                        self.logger.warning("Failed to fetch detail for %s: %s", did, err2)
-
-                if state is not None:
+                else:
                     base["lastState"] = state
-                    base.setdefault("data", by_id.get(did, {}).get("data"))
+                    base.setdefault("data", None)
 
                 enriched.append(base)
 
+            self.data_by_id = dict(zip(target_ids, enriched))
+            self._state_time = self.hass.loop.time()
+            self._adapt_interval(enriched)
             self.logger.debug("Enriched %s devices; sample=%s", len(enriched), enriched[0] if enriched else None)
             return enriched
 
@@ -4,7 +4,7 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -12,18 +12,27 @@ from homeassistant.helpers.device_registry import DeviceInfo
 
 from .const import DOMAIN
 from .coordinator import CubyCoordinator
-from .api import CubyApi, CubyApiError
+from .api import CubyApi
 
 _LOGGER = logging.getLogger(__name__)
-PARALLEL_UPDATES = 0
+PARALLEL_UPDATES = 0  # writes are serialized per device by the coordinator
 
-# Each tuple: (key_in_lastState, type_value, human_name)
+# Each tuple: (key_in_lastState, type_value); names come from translations (entity.switch.<key>)
 SWITCH_SPECS = [
-    ("eco",     "eco",     "Eco"),
-    ("turbo",   "turbo",   "Turbo"),  
-    ("long",    "long",    "Long"),
+    ("eco",     "eco"),
+    ("turbo",   "turbo"),
+    ("long",    "long"),
 ]
 
+# lastState values that mean "on" (compared as-is, no str()/lower() per read)
+_ON_VALUES = frozenset({"on", "ON", "On", True, 1, "1", "true", "True"})
+
+_ICON_MAP = {
+    "eco": "mdi:leaf",
+    "turbo": "mdi:run-fast",
+    "long": "mdi:weather-windy",
+}
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -36,41 +45,59 @@ async def async_setup_entry(
     token: str = entry.data["token"]
 
     selected_ids: Optional[List[str]] = entry.options.get("device_ids", entry.data.get("device_ids", None))
-    devices = coordinator.data or []
-
-    entities: List[CubyToggleSwitch] = []
-    for dev in devices:
-        if not isinstance(dev, dict):
-            continue
-        dev_id = str(dev.get("id") or "").strip()
-        if not dev_id:
-            continue
-        if isinstance(selected_ids, list) and dev_id not in selected_ids:
-            continue
-
-        base_name = dev.get("name") or f"Cuby {dev_id}"
-        for (state_key, type_key, human) in SWITCH_SPECS:
-            entities.append(
-                CubyToggleSwitch(
-                    coordinator=coordinator,
-                    api=api,
-                    token=token,
-                    device_id=dev_id,
-                    device_name=base_name,
-                    state_key=state_key,
-                    type_key=type_key,
-                    friendly_name=f"{base_name} {human}",
+    selected_set = frozenset(selected_ids) if isinstance(selected_ids, list) else None
+    known_ids: set[str] = set()
+
+    @callback
+    def _add_new_entities() -> None:
+        entities: List[CubyToggleSwitch] = []
+        for dev_id, dev in coordinator.data_by_id.items():
+            if not dev_id or dev_id in known_ids:
+                continue
+            if selected_set is not None and dev_id not in selected_set:
+                continue
+
+            # Only create switches the device actually reports (capabilities list, else lastState keys)
+            last = dev.get("lastState") or {}
+            caps = dev.get("capabilities")
+            supported = caps if isinstance(caps, list) else last
+            if not supported:
+                continue  # state not fetched yet; try again on the next refresh
+            known_ids.add(dev_id)
+
+            skipped: List[str] = []
+            for (state_key, type_key) in SWITCH_SPECS:
+                if state_key not in supported:
+                    skipped.append(state_key)
+                    continue
+                entities.append(
+                    CubyToggleSwitch(
+                        coordinator=coordinator,
+                        api=api,
+                        token=token,
+                        device_id=dev_id,
+                        state_key=state_key,
+                        type_key=type_key,
+                    )
                 )
-            )
+            if skipped:
+                _LOGGER.debug("Device %s does not report %s; skipping those switches", dev_id, skipped)
 
-    _LOGGER.debug("Adding %s switch entities", len(entities))
-    async_add_entities(entities)
+        if entities:
+            _LOGGER.debug("Adding %s switch entities", len(entities))
+            async_add_entities(entities)
+
+    _add_new_entities()
+    # The first refresh may still be running; add devices as they show up
+    entry.async_on_unload(coordinator.async_add_listener(_add_new_entities))
 
 
 class CubyToggleSwitch(CoordinatorEntity[CubyCoordinator], SwitchEntity):
     """Generic ON/OFF switch for a lastState boolean-like flag."""
 
-    _attr_has_entity_name = False
+    # No __slots__: HA's Entity base declares none, so every instance keeps a __dict__ (which also
+    # holds all _attr_* fields); slots on this subclass would not shrink entities measurably.
+    _attr_has_entity_name = True
 
     def __init__(
         self,
@@ -78,48 +105,58 @@ class CubyToggleSwitch(CoordinatorEntity[CubyCoordinator], SwitchEntity):
         api: CubyApi,
         token: str,
         device_id: str,
-        device_name: str,
         state_key: str,
         type_key: str,
-        friendly_name: str,
     ) -> None:
         super().__init__(coordinator)
         self._api = api
         self._token = token
         self._device_id = device_id
-        self._device_name = device_name
         self._state_key = state_key      # key in lastState: "eco"/"turbo"/"long"
         self._type_key = type_key
-        self._attr_name = friendly_name
-        icon_map = {
-            "eco": "mdi:leaf",
-            "turbo": "mdi:run-fast",
-            "long": "mdi:weather-windy",
-        }
-        self._attr_icon = icon_map.get(self._state_key, "mdi:tune-variant")
+        # Immutable per entity; never mutated after construction
+        self._payload_on = {"type": type_key, state_key: "on"}
+        self._payload_off = {"type": type_key, state_key: "off"}
+        self._attr_translation_key = state_key
+        self._attr_icon = _ICON_MAP.get(state_key, "mdi:tune-variant")
         self._attr_unique_id = f"{DOMAIN}_{device_id}_{state_key}"
 
         # initial
-        self._attr_is_on = self._read_is_on()
+        d = self._device_payload() or {}
+        self._attr_is_on = self._compute_is_on(d)
+        self._cached_fw = str(d.get("firmwareVersion") or "unknown")
+        self._attr_device_info = self._build_device_info(d, self._cached_fw)
+        self._last_available: bool | None = None
 
     # ----- Helpers -----
     def _device_payload(self) -> Dict[str, Any] | None:
-        for d in self.coordinator.data or []:
-            if isinstance(d, dict) and str(d.get("id") or "").strip() == self._device_id:
-                return d
-        return None
+        return self.coordinator.data_by_id.get(self._device_id)
 
-    def _read_is_on(self) -> bool:
-        dev = self._device_payload() or {}
+    def _compute_is_on(self, dev: Dict[str, Any]) -> bool:
         last = dev.get("lastState") or {}
-        val = str((last.get(self._state_key) or "off")).lower()
-        return val == "on"
+        val = last.get(self._state_key)
+        # Missing keys (None) and unhashable values are simply "off"
+        return isinstance(val, (str, int)) and val in _ON_VALUES
+
+    # ----- Coordinator hooks -----
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # The only dict walk per refresh; reads just return the cached _attr_is_on
+        d = self._device_payload() or {}
+        is_on = self._compute_is_on(d)
+        # DeviceInfo is built once; only a firmware change warrants a rebuild
+        fw = str(d.get("firmwareVersion") or "unknown")
+        if fw != self._cached_fw:
+            self._cached_fw = fw
+            self._attr_device_info = self._build_device_info(d, fw)
+        # Skip the write when nothing visible changed (e.g. the push after an optimistic toggle)
+        available = self.available
+        if is_on != self._attr_is_on or available != self._last_available:
+            self._attr_is_on = is_on
+            self._last_available = available
+            super()._handle_coordinator_update()
 
     # ----- SwitchEntity API -----
-    @property
-    def is_on(self) -> bool:
-        return self._read_is_on()
-
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self._post_state(True)
 
@@ -127,27 +164,31 @@ class CubyToggleSwitch(CoordinatorEntity[CubyCoordinator], SwitchEntity):
         await self._post_state(False)
 
     async def _post_state(self, turn_on: bool) -> None:
-        payload = {"type": self._type_key, self._state_key: "on" if turn_on else "off"}
-        try:
-            _LOGGER.debug("[CUBY] set_state(%s): %s", self._device_id, payload)
-            await self._api.set_state(self._token, self._device_id, payload)
-        except CubyApiError as err:
-            _LOGGER.error("[CUBY] set_state failed for %s: %s", self._device_id, err)
-            raise
-        # reflect & refresh
+        # Already there and the cache is recent: skip the API call. A stale cache (polling backs off
+        # to minutes) may hide a change made outside HA, e.g. with the IR remote, so send it anyway.
+        if self._attr_is_on is turn_on and self.coordinator.state_is_fresh():
+            _LOGGER.debug("[CUBY] %s %s already %s; skipping set_state", self._device_id, self._state_key, turn_on)
+            return
+        payload = self._payload_on if turn_on else self._payload_off
+        # Reflect in UI right away; on any failure fall back to what the coordinator last saw
         self._attr_is_on = turn_on
         self.async_write_ha_state()
-        await self.coordinator.async_request_refresh()
+        try:
+            # Coalesced with other writes for this device; we know the result, so no refresh needed
+            posted = await self.coordinator.queue_write(self._device_id, payload, refresh=False)
+        except Exception:
+            self._attr_is_on = self._compute_is_on(self._device_payload() or {})
+            self.async_write_ha_state()
+            raise
+        # A later toggle in the same burst may have replaced ours; apply what was actually sent
+        self.coordinator.apply_local_state(self._device_id, {self._state_key: posted[self._state_key]})
 
     # ----- Device registry -----
-    @property
-    def device_info(self) -> DeviceInfo:
-        d = self._device_payload() or {}
+    def _build_device_info(self, d: Dict[str, Any], fw: str) -> DeviceInfo:
         model = d.get("model", "Cuby Smart AC Controller")
-        fw = str(d.get("firmwareVersion") or "unknown")
         return DeviceInfo(
             identifiers={(DOMAIN, self._device_id)},
-            name=self._device_name,
+            name=d.get("name") or f"Cuby {self._device_id}",
             manufacturer="Cuby",
             model=str(model),
             sw_version=fw,